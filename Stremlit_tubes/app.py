@@ -4,6 +4,8 @@ Aplikasi utama Streamlit untuk Dashboard Perpustakaan Seperlima.
 Mengatur tata letak halaman, pemanggilan data, dan pemanggilan fungsi grafik.
 """
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 from db import load_peminjaman_detail, load_anggota, load_buku
@@ -107,9 +109,20 @@ def show_empty_message():
 # HALAMAN: RINGKASAN UMUM
 # ======================================================
 if page == "Ringkasan umum":
+    # Kolom yang dipakai KPI dan grafik ringkasan saja
+    kolom_ringkasan = (
+        "id_anggota",
+        "id_buku",
+        "denda_buku",
+        "tgl_pinjam",
+        "durasi_peminjaman",
+        "status_peminjaman",
+        "nama_fakultas",
+        "kategori_buku",
+    )
     try:
         with st.spinner("Memuat data peminjaman..."):
-            df_pinjam = load_peminjaman_detail()
+            df_pinjam = load_peminjaman_detail(kolom_ringkasan)
     except Exception as e:
         st.error("Gagal memuat data peminjaman dari database. Periksa koneksi ke MySQL.")
         st.exception(e)
@@ -174,11 +187,16 @@ if page == "Ringkasan umum":
         st.plotly_chart(fig_tren, use_container_width=True)
 
         # Insight otomatis: bulan dengan peminjaman tertinggi
-        df_bulan = df_pinjam.copy()
-        df_bulan["bulan"] = df_bulan["tgl_pinjam"].dt.to_period("M").astype(str)
-        per_bulan = df_bulan.groupby("bulan").size().reset_index(name="jumlah")
+        # kunci bulan lewat cast datetime64[M] (tanpa copy DataFrame dan tanpa
+        # Period/str per baris); label "YYYY-MM" hanya untuk hasil agregat
+        bulan = df_pinjam["tgl_pinjam"].to_numpy().astype("datetime64[M]")
+        per_bulan = pd.Series(bulan).value_counts(sort=False).sort_index()
+        per_bulan = pd.DataFrame({
+            "bulan": np.datetime_as_string(per_bulan.index.to_numpy(), unit="M"),
+            "jumlah": per_bulan.to_numpy(),
+        })
         if not per_bulan.empty:
-            puncak = per_bulan.sort_values("jumlah", ascending=False).iloc[0]
+            puncak = per_bulan.loc[per_bulan["jumlah"].idxmax()]
             st.caption(
                 f"Periode dengan jumlah peminjaman tertinggi adalah {puncak['bulan']} "
                 f"dengan {puncak['jumlah']} transaksi."
@@ -195,7 +213,7 @@ if page == "Ringkasan umum":
         st.plotly_chart(fig_fak, use_container_width=True)
 
         if not per_fak.empty:
-            fak_tertinggi = per_fak.sort_values("jumlah", ascending=False).iloc[0]
+            fak_tertinggi = per_fak.loc[per_fak["jumlah"].idxmax()]
             st.caption(
                 f"Fakultas dengan peminjaman tertinggi adalah {fak_tertinggi['nama_fakultas']} "
                 f"dengan {fak_tertinggi['jumlah']} transaksi."
@@ -213,7 +231,7 @@ if page == "Ringkasan umum":
             st.plotly_chart(fig_heat, use_container_width=True)
 
             # Insight otomatis: kombinasi fakultas-kategori tertinggi
-            baris_tertinggi = per_fak_kat.sort_values("jumlah", ascending=False).iloc[0]
+            baris_tertinggi = per_fak_kat.loc[per_fak_kat["jumlah"].idxmax()]
             st.caption(
                 f"Kombinasi paling sering adalah Fakultas {baris_tertinggi['nama_fakultas']} "
                 f"dengan kategori {baris_tertinggi['kategori_buku']} "
@@ -233,7 +251,7 @@ if page == "Ringkasan umum":
 
         if fig_durasi is not None:
             st.plotly_chart(fig_durasi, use_container_width=True)
-            fak_durasi_top = durasi_fak.sort_values("rata_durasi", ascending=False).iloc[0]
+            fak_durasi_top = durasi_fak.loc[durasi_fak["rata_durasi"].idxmax()]
             st.caption(
                 f"Fakultas dengan rata-rata durasi peminjaman paling lama adalah "
                 f"{fak_durasi_top['nama_fakultas']} "
@@ -7,6 +7,9 @@ Setiap fungsi menerima DataFrame dan mengembalikan objek figure.
 import plotly.express as px
 import pandas as pd
 
+# Batas jumlah baris agar boxplot masih menampilkan semua titik
+BOX_MAX_POINTS = 2000
+
 
 # ==============================
 # Grafik untuk halaman Ringkasan
@@ -17,14 +20,18 @@ def chart_tren_bulanan_status(df_pinjam: pd.DataFrame):
     Membuat grafik batang bertumpuk (stacked bar) jumlah peminjaman per bulan
     yang dikelompokkan berdasarkan status peminjaman.
     """
-    df = df_pinjam.copy()
-    df["bulan"] = df["tgl_pinjam"].dt.to_period("M").astype(str)
-
-    per_bulan_status = (
-        df.groupby(["bulan", "status_peminjaman"])
-          .size()
-          .reset_index(name="jumlah")
+    # Bulan dipotong di level NumPy (datetime64[M]) tanpa menyalin df_pinjam;
+    # label "YYYY-MM" hanya dibuat untuk indeks crosstab (satu per bulan).
+    bulan = pd.Series(
+        df_pinjam["tgl_pinjam"].to_numpy().astype("datetime64[M]"),
+        index=df_pinjam.index,
+        name="bulan",
     )
+    ct = pd.crosstab(bulan, df_pinjam["status_peminjaman"])
+    ct.index = ct.index.strftime("%Y-%m")
+
+    per_bulan_status = ct.stack().rename("jumlah").reset_index()
+    per_bulan_status = per_bulan_status[per_bulan_status["jumlah"] > 0]
 
     fig = px.bar(
         per_bulan_status,
@@ -44,7 +51,11 @@ def chart_peminjaman_per_fakultas(df_pinjam: pd.DataFrame):
     """
     Membuat grafik batang jumlah peminjaman per fakultas.
     """
-    per_fak = df_pinjam.groupby("nama_fakultas").size().reset_index(name="jumlah")
+    per_fak = (
+        df_pinjam["nama_fakultas"].value_counts(sort=False)
+        .rename_axis("nama_fakultas")
+        .reset_index(name="jumlah")
+    )
 
     fig = px.bar(
         per_fak,
@@ -65,22 +76,20 @@ def chart_heatmap_fakultas_kategori(df_pinjam: pd.DataFrame):
     Membuat peta panas (heatmap) peminjaman berdasarkan kombinasi
     fakultas dan kategori buku.
     """
-    per_fak_kat = (
-        df_pinjam
-        .groupby(["nama_fakultas", "kategori_buku"])
-        .size()
-        .reset_index(name="jumlah")
-    )
+    # Matriks fakultas x kategori langsung dari crosstab; px.imshow menggambar
+    # matriks itu apa adanya tanpa binning ulang seperti density_heatmap.
+    ct = pd.crosstab(df_pinjam["nama_fakultas"], df_pinjam["kategori_buku"])
+    per_fak_kat = ct.stack().rename("jumlah").reset_index()
+    per_fak_kat = per_fak_kat[per_fak_kat["jumlah"] > 0]
 
     if per_fak_kat.empty:
         return None, per_fak_kat
 
-    fig = px.density_heatmap(
-        per_fak_kat,
-        x="kategori_buku",
-        y="nama_fakultas",
-        z="jumlah",
+    fig = px.imshow(
+        ct,
         color_continuous_scale="Blues",
+        aspect="auto",
+        labels=dict(x="Kategori buku", y="Fakultas", color="jumlah"),
         title="Pola peminjaman berdasarkan fakultas dan kategori buku",
     )
     fig.update_layout(
@@ -95,7 +104,7 @@ def chart_durasi_rata_per_fakultas(df_pinjam: pd.DataFrame):
     Membuat grafik batang rata-rata durasi peminjaman per fakultas.
     """
     durasi_fak = (
-        df_pinjam.groupby("nama_fakultas")["durasi_peminjaman"]
+        df_pinjam.groupby("nama_fakultas", sort=False, observed=True)["durasi_peminjaman"]
         .mean()
         .reset_index(name="rata_durasi")
     )
@@ -125,7 +134,11 @@ def chart_peminjaman_per_status(df_filtered: pd.DataFrame):
     """
     Membuat grafik batang distribusi jumlah peminjaman per status peminjaman.
     """
-    per_status = df_filtered.groupby("status_peminjaman").size().reset_index(name="jumlah")
+    per_status = (
+        df_filtered["status_peminjaman"].value_counts(sort=False)
+        .rename_axis("status_peminjaman")
+        .reset_index(name="jumlah")
+    )
 
     if per_status.empty:
         return None, per_status
@@ -149,12 +162,12 @@ def chart_top5_judul(df_filtered: pd.DataFrame):
     Membuat grafik batang horizontal untuk lima judul buku
     dengan frekuensi peminjaman tertinggi.
     """
+    # value_counts sudah urut menurun: tidak perlu sort_values lagi
     top_judul = (
-        df_filtered.groupby("judul")
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
+        df_filtered["judul"].value_counts()
         .head(5)
+        .rename_axis("judul")
+        .reset_index(name="jumlah")
     )
 
     if top_judul.empty:
@@ -180,16 +193,20 @@ def chart_boxplot_durasi_per_status(df_filtered: pd.DataFrame):
     """
     Membuat boxplot sebaran durasi peminjaman untuk setiap status peminjaman.
     """
-    df_durasi = df_filtered[df_filtered["durasi_peminjaman"].notna()].copy()
+    df_durasi = df_filtered.dropna(subset=["durasi_peminjaman"])
 
     if df_durasi.empty:
         return None
 
+    # Semua titik hanya digambar bila datanya kecil; selebihnya cukup outlier,
+    # agar browser tidak menerima satu marker per transaksi.
+    points = "all" if len(df_durasi) <= BOX_MAX_POINTS else "outliers"
+
     fig = px.box(
         df_durasi,
         x="status_peminjaman",
         y="durasi_peminjaman",
-        points="all",
+        points=points,
         title="Sebaran durasi peminjaman per status peminjaman",
     )
     fig.update_layout(
@@ -207,7 +224,11 @@ def chart_anggota_per_status(df_anggota_view: pd.DataFrame):
     """
     Membuat grafik batang jumlah anggota per status keanggotaan.
     """
-    per_status = df_anggota_view.groupby("status_anggota").size().reset_index(name="jumlah")
+    per_status = (
+        df_anggota_view["status_anggota"].value_counts(sort=False)
+        .rename_axis("status_anggota")
+        .reset_index(name="jumlah")
+    )
 
     fig = px.bar(
         per_status,
@@ -227,7 +248,11 @@ def chart_anggota_per_fakultas_treemap(df_anggota_view: pd.DataFrame):
     """
     Membuat treemap jumlah anggota per fakultas.
     """
-    per_fak = df_anggota_view.groupby("nama_fakultas").size().reset_index(name="jumlah")
+    per_fak = (
+        df_anggota_view["nama_fakultas"].value_counts(sort=False)
+        .rename_axis("nama_fakultas")
+        .reset_index(name="jumlah")
+    )
 
     fig = px.treemap(
         per_fak,
@@ -246,7 +271,11 @@ def chart_buku_per_kategori(df_buku_view: pd.DataFrame):
     """
     Membuat grafik batang horizontal jumlah buku per kategori.
     """
-    per_kat = df_buku_view.groupby("kategori_buku").size().reset_index(name="jumlah")
+    per_kat = (
+        df_buku_view["kategori_buku"].value_counts(sort=False)
+        .rename_axis("kategori_buku")
+        .reset_index(name="jumlah")
+    )
 
     fig = px.bar(
         per_kat,
@@ -268,7 +297,12 @@ def chart_buku_per_tahun(df_buku_view: pd.DataFrame):
     """
     Membuat grafik garis jumlah buku per tahun terbit.
     """
-    per_tahun = df_buku_view.groupby("tahun_terbit").size().reset_index(name="jumlah")
+    per_tahun = (
+        df_buku_view["tahun_terbit"].value_counts(sort=False)
+        .sort_index()
+        .rename_axis("tahun_terbit")
+        .reset_index(name="jumlah")
+    )
 
     fig = px.line(
         per_tahun,
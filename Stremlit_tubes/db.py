@@ -24,19 +24,23 @@ def get_connection():
 
 
 @st.cache_data
-def load_peminjaman_detail():
+def load_peminjaman_detail(columns=None):
     """
     Mengambil data dari view vw_peminjaman_detail.
     View ini menggabungkan informasi peminjaman, anggota, buku, prodi, dan fakultas.
+    `columns` (opsional, tuple nama kolom) membatasi kolom yang di-SELECT,
+    sehingga kolom yang tidak dipakai (email, isbn, ...) tidak ikut dikirim.
     Hasil dikembalikan sebagai DataFrame.
     """
+    kolom = ", ".join(columns) if columns else "*"
     conn = get_connection()
-    df = pd.read_sql("SELECT * FROM vw_peminjaman_detail", conn)
+    df = pd.read_sql(f"SELECT {kolom} FROM vw_peminjaman_detail", conn)
     conn.close()
 
     # Konversi kolom tanggal ke tipe datetime untuk memudahkan filter dan visualisasi
-    df["tgl_pinjam"] = pd.to_datetime(df["tgl_pinjam"])
-    df["tgl_kembali"] = pd.to_datetime(df["tgl_kembali"])
+    for col in ("tgl_pinjam", "tgl_kembali"):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
     return df
 
 
@@ -12,10 +12,22 @@ Fitur utama:
 Seluruh data diambil dari database MySQL 'seperlima' melalui modul db.py.
 """
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+try:
+    # pyarrow biasanya sudah terpasang sebagai dependensi streamlit
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 from db import (
+    CACHE_TTL,
     load_peminjaman_detail,
+    load_peminjaman_facets,
+    load_kpi_peminjaman,
+    load_agg_ringkasan,
     load_anggota,
     load_buku,
     load_fakultas,
@@ -27,19 +39,12 @@ from db import (
     load_klasifikasi,
 )
 
+# Grafik halaman lain di-import di dalam cabang halamannya masing-masing.
 from charts import (
     chart_tren_bulanan_status,
     chart_peminjaman_per_fakultas,
     chart_peminjaman_per_kategori,
     chart_durasi_rata_per_fakultas,
-    chart_peminjaman_per_status,
-    chart_top5_judul,
-    chart_hist_durasi,
-    chart_anggota_per_status,
-    chart_anggota_per_fakultas,
-    chart_buku_per_kategori,
-    chart_buku_per_status,
-    chart_buku_per_tahun,
 )
 
 # ======================================================
@@ -120,26 +125,238 @@ st.sidebar.caption(
     "anggota, petugas, buku, dan transaksi peminjaman."
 )
 
+# Data di-cache (lihat db.py); tombol ini memaksa query ulang ke MySQL.
+if st.sidebar.button("Muat ulang data"):
+    st.cache_data.clear()
+
 
 def show_empty_message():
     """Pesan standar ketika hasil filter data kosong."""
     st.info("Data tidak tersedia untuk kombinasi filter yang dipilih.")
 
 
+def show_metric_card(label, value, sub):
+    """Kartu KPI (.metric-card) dikirim sebagai satu blok HTML / satu st.markdown."""
+    st.markdown(
+        f'<div class="metric-card">'
+        f'<div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{value}</div>'
+        f'<div class="metric-sub">{sub}</div>'
+        f'</div>',
+        unsafe_allow_html=True,
+    )
+
+
+# Jumlah baris awal tabel besar yang dikirim ke browser per rerun
+BATAS_BARIS_TABEL = 1000
+
+# Config Plotly untuk grafik komposisi (donut, treemap) yang tidak butuh
+# zoom/pan: dirender sebagai gambar statis tanpa modebar & handler interaksi.
+PLOTLY_CONFIG_STATIS = {"staticPlot": True, "displayModeBar": False}
+
+
+@st.fragment
+def show_table(df, key):
+    """
+    Tampilkan tabel dengan jumlah baris dibatasi. Serialisasi Arrow ke browser
+    sebanding dengan jumlah baris, jadi hanya N baris teratas yang dikirim;
+    pengguna bisa menambah N lewat input angka.
+
+    Dibungkus st.fragment: mengubah jumlah baris hanya me-rerun tabel ini,
+    bukan memuat ulang data, filter, dan seluruh grafik halaman.
+    """
+    n_baris = len(df)
+    if n_baris > BATAS_BARIS_TABEL:
+        n_baris = int(
+            st.number_input(
+                "Baris ditampilkan",
+                min_value=100,
+                max_value=len(df),
+                value=BATAS_BARIS_TABEL,
+                step=100,
+                key=key,
+            )
+        )
+        st.caption(
+            f"Menampilkan {n_baris} dari {len(df)} baris. "
+            "File unduhan tetap berisi seluruh baris."
+        )
+    tampil = df.head(n_baris)
+    if pa is not None:
+        # kolom teks object -> string Arrow: dikirim apa adanya ke browser,
+        # tanpa konversi objek Python per sel saat serialisasi.
+        teks = tampil.select_dtypes(include="object").columns
+        tampil = tampil.astype({col: pd.ArrowDtype(pa.string()) for col in teks})
+    st.dataframe(tampil, use_container_width=True, height=350)
+
+
+def nilai_filter(pilihan):
+    """Nilai selectbox untuk argumen filter loader: "(Semua)" -> None."""
+    return None if pilihan == "(Semua)" else pilihan
+
+
+def opsi_filter(s):
+    """
+    Nilai unik terurut (tanpa NULL) untuk pilihan selectbox. Kolom category
+    dari db.py sudah membawa daftar kategori terurut, jadi tidak perlu scan
+    ulang seluruh kolom.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.categories.tolist()
+    return sorted(s.dropna().unique().tolist())
+
+
+def pakai_uirevision(grafik, revisi):
+    """
+    Set layout.uirevision semua figure di dict `grafik` (nilai berupa Figure
+    atau tuple (Figure, DataFrame)). Plotly mempertahankan zoom & legend yang
+    disembunyikan pengguna selama uirevision sama; `revisi` diturunkan dari
+    nilai filter, jadi filter yang sama menjaga tampilan dan filter baru
+    mereset tampilan ke data yang baru.
+    """
+    for nilai in grafik.values():
+        fig = nilai[0] if isinstance(nilai, tuple) else nilai
+        if hasattr(fig, "update_layout"):
+            fig.update_layout(uirevision=revisi)
+    return grafik
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def ringkasan_charts(agg):
+    """
+    Figure (beserta agregatnya) untuk keempat tab Ringkasan, dibangun dari
+    agregat GROUP BY MySQL (db.load_agg_ringkasan), bukan dari seluruh baris
+    peminjaman. Kunci cache = isi agregat itu sendiri (beberapa puluh baris,
+    murah di-hash): perubahan data apa pun, mis. status peminjaman yang
+    berubah tanpa mengubah angka KPI, langsung menghasilkan figure baru.
+    """
+    # agregat per fakultas dipakai bersama oleh tab fakultas dan tab durasi
+    agg_fak = agg["fakultas"]
+    tren = chart_tren_bulanan_status(agregat=agg["tren"])
+
+    # insight bulan puncak ikut di-cache: (bulan "YYYY-MM", jumlah) atau None
+    per_bulan_status = tren[1]
+    puncak_bulan = None
+    if not per_bulan_status.empty:
+        per_bulan = per_bulan_status.groupby("bulan", sort=False)["jumlah"].sum()
+        bulan_puncak = per_bulan.idxmax()
+        puncak_bulan = (bulan_puncak, int(per_bulan[bulan_puncak]))
+
+    # halaman tanpa filter: satu revisi tetap
+    return pakai_uirevision({
+        "tren": tren,
+        "puncak_bulan": puncak_bulan,
+        "fakultas": chart_peminjaman_per_fakultas(agregat=agg_fak),
+        "kategori": chart_peminjaman_per_kategori(agregat=agg["kategori"]),
+        "durasi": chart_durasi_rata_per_fakultas(agregat=agg_fak),
+    }, "ringkasan")
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=32)
+def peminjaman_charts(df, revisi):
+    """
+    Figure halaman Peminjaman untuk satu hasil filter. Kunci cache = isi df
+    (di-hash Streamlit), sehingga kembali ke filter yang pernah dipilih memakai
+    figure dari cache, sedangkan perubahan isi data (status, denda) yang tidak
+    mengubah jumlah baris tetap menghasilkan figure baru. `revisi` = uirevision
+    figure (lihat pakai_uirevision).
+    """
+    from charts import (
+        chart_peminjaman_per_status,
+        chart_top5_judul,
+        chart_hist_durasi,
+    )
+
+    return pakai_uirevision({
+        "status": chart_peminjaman_per_status(df),
+        "top5": chart_top5_judul(df),
+        "hist": chart_hist_durasi(df),
+    }, revisi)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=32)
+def anggota_charts(df, revisi):
+    """
+    Figure halaman Anggota untuk satu hasil pencarian. Kunci cache = isi df
+    (di-hash Streamlit): mengetik ulang kata yang sama atau menghapusnya
+    memakai figure dari cache, perubahan isi data menghasilkan figure baru.
+    `revisi` = uirevision figure (lihat pakai_uirevision).
+    """
+    from charts import chart_anggota_per_status, chart_anggota_per_fakultas
+
+    return pakai_uirevision({
+        "status": chart_anggota_per_status(df),
+        "fakultas": chart_anggota_per_fakultas(df),
+    }, revisi)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=32)
+def buku_charts(df, revisi):
+    """
+    Figure halaman Buku untuk satu hasil pencarian + filter, di-cache per isi
+    df seperti anggota_charts. `revisi` = uirevision figure.
+    """
+    from charts import (
+        chart_buku_per_kategori,
+        chart_buku_per_status,
+        chart_buku_per_tahun,
+    )
+
+    return pakai_uirevision({
+        "kategori": chart_buku_per_kategori(df),
+        "status": chart_buku_per_status(df),
+        "tahun": chart_buku_per_tahun(df),
+    }, revisi)
+
+
+def csv_bytes(df):
+    """Isi file CSV untuk tombol unduh (df.to_csv tanpa index, UTF-8)."""
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=8)
+def to_csv_bytes(df):
+    """
+    csv_bytes(df) yang di-cache per isi DataFrame: file data lengkap (tanpa
+    filter) cukup disusun sekali per versi data, bukan setiap rerun.
+    """
+    return csv_bytes(df)
+
+
+def show_download(df, nama_file, label, lengkap=False):
+    """
+    Tombol unduh CSV untuk df.
+
+    Data lengkap (`lengkap=True`, tanpa filter/pencarian) memakai file yang
+    sudah disiapkan di cache to_csv_bytes. Hasil filter berubah-ubah, jadi
+    file-nya baru disusun saat tombol diklik (data berupa callable), bukan
+    pada setiap rerun.
+    """
+    st.download_button(
+        label=f"Unduh {label} (CSV)",
+        data=to_csv_bytes(df) if lengkap else (lambda: csv_bytes(df)),
+        file_name=f"{nama_file}.csv",
+        mime="text/csv",
+    )
+
+
 # ======================================================
 # HALAMAN: RINGKASAN
 # ======================================================
 
 if page == "Ringkasan":
+    # Halaman ini hanya memakai agregat (KPI & GROUP BY) dari MySQL; baris
+    # detail peminjaman tidak dimuat sama sekali.
     try:
         with st.spinner("Memuat data peminjaman..."):
-            df_pinjam = load_peminjaman_detail()
+            # COUNT / COUNT(DISTINCT) / SUM dihitung MySQL dalam satu query
+            kpi = load_kpi_peminjaman()
     except Exception as e:
         st.error("Gagal memuat data peminjaman dari database. Periksa koneksi ke MySQL.")
         st.exception(e)
         st.stop()
 
-    if df_pinjam.empty:
+    if kpi["total_peminjaman"] == 0:
         st.warning("Belum ada data peminjaman pada database.")
         st.stop()
 
@@ -149,40 +366,24 @@ if page == "Ringkasan":
     )
 
     # ----------------- Kartu ringkasan (KPI) -----------------
-    total_peminjaman = len(df_pinjam)
-    total_anggota_aktif = df_pinjam["id_anggota"].nunique()
-    total_buku_dipinjam = df_pinjam["id_buku"].nunique()
-    total_denda = int(df_pinjam["denda_buku"].sum())
+    total_peminjaman = kpi["total_peminjaman"]
+    total_anggota_aktif = kpi["anggota_aktif"]
+    total_buku_dipinjam = kpi["buku_dipinjam"]
+    total_denda = kpi["total_denda"]
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<div class="metric-label">Total peminjaman</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">{total_peminjaman}</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-sub">Seluruh transaksi peminjaman</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        show_metric_card("Total peminjaman", total_peminjaman, "Seluruh transaksi peminjaman")
 
     with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<div class="metric-label">Anggota aktif</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">{total_anggota_aktif}</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-sub">Pernah melakukan peminjaman</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        show_metric_card("Anggota aktif", total_anggota_aktif, "Pernah melakukan peminjaman")
 
     with col3:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<div class="metric-label">Buku yang dipinjam</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">{total_buku_dipinjam}</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-sub">Berdasarkan variasi ID buku</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        show_metric_card("Buku yang dipinjam", total_buku_dipinjam, "Berdasarkan variasi ID buku")
 
     with col4:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.markdown('<div class="metric-label">Total denda</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">Rp {total_denda:,.0f}</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-sub">Akumulasi dari seluruh transaksi</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        show_metric_card("Total denda", f"Rp {total_denda:,.0f}", "Akumulasi dari seluruh transaksi")
 
     st.markdown("### Ikhtisar grafik")
     st.write(
@@ -199,26 +400,31 @@ if page == "Ringkasan":
         ]
     )
 
+    try:
+        grafik = ringkasan_charts(load_agg_ringkasan())
+    except Exception as e:
+        st.error("Gagal memuat data peminjaman dari database. Periksa koneksi ke MySQL.")
+        st.exception(e)
+        st.stop()
+
     # Tab 1: Perkembangan peminjaman dari waktu ke waktu
     with tab1:
         st.subheader("Perkembangan peminjaman dari waktu ke waktu")
-        fig_tren = chart_tren_bulanan_status(df_pinjam)
+        fig_tren, _ = grafik["tren"]
         st.plotly_chart(fig_tren, use_container_width=True)
 
-        df_bulan = df_pinjam.copy()
-        df_bulan["bulan"] = df_bulan["tgl_pinjam"].dt.to_period("M").astype(str)
-        per_bulan = df_bulan.groupby("bulan").size().reset_index(name="jumlah")
-        if not per_bulan.empty:
-            puncak = per_bulan.sort_values("jumlah", ascending=False).iloc[0]
+        # Bulan puncak dihitung di ringkasan_charts dari agregat tren
+        if grafik["puncak_bulan"] is not None:
+            bulan_puncak, jumlah_puncak = grafik["puncak_bulan"]
             st.caption(
-                f"Periode dengan jumlah peminjaman tertinggi adalah {puncak['bulan']} "
-                f"dengan {puncak['jumlah']} transaksi."
+                f"Periode dengan jumlah peminjaman tertinggi adalah {bulan_puncak} "
+                f"dengan {jumlah_puncak} transaksi."
             )
 
     # Tab 2: Peminjaman per fakultas
     with tab2:
         st.subheader("Peminjaman per fakultas")
-        fig_fak, per_fak = chart_peminjaman_per_fakultas(df_pinjam)
+        fig_fak, per_fak = grafik["fakultas"]
         st.plotly_chart(fig_fak, use_container_width=True)
 
         if not per_fak.empty:
@@ -231,8 +437,8 @@ if page == "Ringkasan":
     # Tab 3: Peminjaman per kategori buku
     with tab3:
         st.subheader("Peminjaman per kategori buku")
-        fig_kat, per_kat = chart_peminjaman_per_kategori(df_pinjam)
-        st.plotly_chart(fig_kat, use_container_width=True)
+        fig_kat, per_kat = grafik["kategori"]
+        st.plotly_chart(fig_kat, use_container_width=True, config=PLOTLY_CONFIG_STATIS)
 
         if not per_kat.empty:
             kat_tertinggi = per_kat.iloc[0]
@@ -244,7 +450,7 @@ if page == "Ringkasan":
     # Tab 4: Durasi peminjaman per fakultas
     with tab4:
         st.subheader("Rata-rata durasi peminjaman per fakultas")
-        fig_durasi, durasi_fak = chart_durasi_rata_per_fakultas(df_pinjam)
+        fig_durasi, durasi_fak = grafik["durasi"]
         st.plotly_chart(fig_durasi, use_container_width=True)
 
         if not durasi_fak.empty:
@@ -278,15 +484,17 @@ elif page == "Peminjaman":
         "fakultas, program studi, status anggota, status peminjaman, dan kategori buku."
     )
 
+    # Pilihan filter & batas tanggal diambil lewat SELECT DISTINCT / MIN-MAX;
+    # baris peminjaman baru dimuat setelah filter sidebar ditentukan.
     try:
         with st.spinner("Memuat data peminjaman..."):
-            df = load_peminjaman_detail()
+            facets = load_peminjaman_facets()
     except Exception as e:
         st.error("Gagal memuat data peminjaman dari database. Periksa koneksi ke MySQL.")
         st.exception(e)
         st.stop()
 
-    if df.empty:
+    if facets["jumlah"] == 0:
         st.warning("Belum ada data peminjaman pada database.")
         st.stop()
 
@@ -294,8 +502,8 @@ elif page == "Peminjaman":
     st.sidebar.markdown("---")
     st.sidebar.subheader("Filter peminjaman")
 
-    min_date = df["tgl_pinjam"].min().date()
-    max_date = df["tgl_pinjam"].max().date()
+    min_date = facets["min_date"]
+    max_date = facets["max_date"]
 
     date_range = st.sidebar.date_input(
         "Rentang tanggal peminjaman",
@@ -309,11 +517,11 @@ elif page == "Peminjaman":
     else:
         start_date = end_date = date_range
 
-    fakultas_list = ["(Semua)"] + sorted(df["nama_fakultas"].dropna().unique().tolist())
-    prodi_list = ["(Semua)"] + sorted(df["nama_prodi"].dropna().unique().tolist())
-    status_anggota_list = ["(Semua)"] + sorted(df["status_anggota"].dropna().unique().tolist())
-    status_pinjam_list = ["(Semua)"] + sorted(df["status_peminjaman"].dropna().unique().tolist())
-    kategori_list = ["(Semua)"] + sorted(df["kategori_buku"].dropna().unique().tolist())
+    fakultas_list = ["(Semua)"] + facets["fakultas"]
+    prodi_list = ["(Semua)"] + facets["prodi"]
+    status_anggota_list = ["(Semua)"] + facets["status_anggota"]
+    status_pinjam_list = ["(Semua)"] + facets["status_peminjaman"]
+    kategori_list = ["(Semua)"] + facets["kategori"]
 
     fakultas_pilih = st.sidebar.selectbox("Fakultas", fakultas_list)
     prodi_pilih = st.sidebar.selectbox("Program studi", prodi_list)
@@ -321,24 +529,26 @@ elif page == "Peminjaman":
     status_peminjaman_pilih = st.sidebar.selectbox("Status peminjaman", status_pinjam_list)
     kategori_pilih = st.sidebar.selectbox("Kategori buku", kategori_list)
 
-    # Terapkan filter ke DataFrame
-    df_filtered = df[
-        (df["tgl_pinjam"].dt.date >= start_date)
-        & (df["tgl_pinjam"].dt.date <= end_date)
-    ].copy()
-
-    if fakultas_pilih != "(Semua)":
-        df_filtered = df_filtered[df_filtered["nama_fakultas"] == fakultas_pilih]
-    if prodi_pilih != "(Semua)":
-        df_filtered = df_filtered[df_filtered["nama_prodi"] == prodi_pilih]
-    if status_anggota_pilih != "(Semua)":
-        df_filtered = df_filtered[df_filtered["status_anggota"] == status_anggota_pilih]
-    if status_peminjaman_pilih != "(Semua)":
-        df_filtered = df_filtered[df_filtered["status_peminjaman"] == status_peminjaman_pilih]
-    if kategori_pilih != "(Semua)":
-        df_filtered = df_filtered[df_filtered["kategori_buku"] == kategori_pilih]
-
-    df_filtered = df_filtered.sort_values("tgl_pinjam", ascending=False)
+    # Filter dijalankan di MySQL (WHERE).
+    try:
+        with st.spinner("Memfilter data peminjaman..."):
+            df_filtered = load_peminjaman_detail(
+                start=start_date,
+                end=end_date,
+                fakultas=nilai_filter(fakultas_pilih),
+                prodi=nilai_filter(prodi_pilih),
+                status_anggota=nilai_filter(status_anggota_pilih),
+                status_peminjaman=nilai_filter(status_peminjaman_pilih),
+                kategori=nilai_filter(kategori_pilih),
+            )
+    except Exception as e:
+        st.error("Gagal memuat data peminjaman dari database. Periksa koneksi ke MySQL.")
+        st.exception(e)
+        st.stop()
+
+    # Urutkan terbaru dulu: argsort langsung pada nilai int64 datetime64
+    order = np.argsort(df_filtered["tgl_pinjam"].to_numpy().view("i8"), kind="stable")
+    df_filtered = df_filtered.iloc[order[::-1]]
 
     # Ringkasan kondisi filter
     st.caption(
@@ -352,14 +562,20 @@ elif page == "Peminjaman":
 
     # ----------------- Tabel dan tombol unduh -----------------
     with st.expander("Tabel data peminjaman (setelah filter)"):
-        st.dataframe(df_filtered, use_container_width=True, height=350)
-
-    csv_peminjaman = df_filtered.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        label="Unduh data peminjaman (CSV)",
-        data=csv_peminjaman,
-        file_name="peminjaman_filtered.csv",
-        mime="text/csv",
+        show_table(df_filtered, key="baris_peminjaman")
+
+    tanpa_filter = (start_date, end_date) == (min_date, max_date) and all(
+        pilihan == "(Semua)"
+        for pilihan in (
+            fakultas_pilih,
+            prodi_pilih,
+            status_anggota_pilih,
+            status_peminjaman_pilih,
+            kategori_pilih,
+        )
+    )
+    show_download(
+        df_filtered, "peminjaman_filtered", "data peminjaman", lengkap=tanpa_filter
     )
 
     # ----------------- Angka ringkasan sesuai filter -----------------
@@ -375,17 +591,30 @@ elif page == "Peminjaman":
         else:
             st.metric("Rata-rata durasi peminjaman", "-")
 
+    # ----------------- Grafik halaman -----------------
+    # uirevision dari nilai filter: zoom/legend bertahan selama filter sama
+    revisi_filter = repr((
+        start_date,
+        end_date,
+        fakultas_pilih,
+        prodi_pilih,
+        status_anggota_pilih,
+        status_peminjaman_pilih,
+        kategori_pilih,
+    ))
+    grafik = peminjaman_charts(df_filtered, revisi_filter)
+
     # ----------------- Grafik per status dan lima judul teratas -----------------
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Peminjaman per status peminjaman")
-        fig_status, per_status = chart_peminjaman_per_status(df_filtered)
+        fig_status, per_status = grafik["status"]
         st.plotly_chart(fig_status, use_container_width=True)
 
     with col2:
         st.subheader("Lima judul buku paling sering dipinjam")
-        fig_top, top_judul = chart_top5_judul(df_filtered)
+        fig_top, top_judul = grafik["top5"]
         st.plotly_chart(fig_top, use_container_width=True)
 
         if not top_judul.empty:
@@ -401,7 +630,7 @@ elif page == "Peminjaman":
         "Grafik ini menunjukkan sebaran lama peminjaman dalam satuan hari, "
         "sehingga terlihat apakah mayoritas peminjaman masih dalam batas waktu yang wajar."
     )
-    fig_hist, _ = chart_hist_durasi(df_filtered)
+    fig_hist, _ = grafik["hist"]
     st.plotly_chart(fig_hist, use_container_width=True)
 
     # ----------------- Penjelasan logika durasi dan denda -----------------
@@ -477,39 +706,48 @@ elif page == "Anggota":
         st.warning("Belum ada data anggota pada database.")
         st.stop()
 
-    # Pencarian nama anggota
-    search_nama = st.text_input(
-        "Pencarian nama anggota",
-        placeholder="Ketik nama atau sebagian nama anggota...",
-    )
-    df_anggota_view = df_anggota.copy()
-    if search_nama:
-        df_anggota_view = df_anggota_view[
-            df_anggota_view["nama_anggota"].str.contains(search_nama, case=False, na=False)
-        ]
+    # Pencarian, tabel, dan grafik dibungkus st.fragment: mengetik di kotak
+    # pencarian hanya me-rerun bagian ini, bukan header/sidebar/loader.
+    @st.fragment
+    def anggota_view(df_anggota):
+        # Pencarian nama anggota
+        search_nama = st.text_input(
+            "Pencarian nama anggota",
+            placeholder="Ketik nama atau sebagian nama anggota...",
+        )
+        # baris (mask) dan kolom (tanpa _nama_lc) dipilih sekali: hanya satu salinan.
+        cols = df_anggota.columns.drop("_nama_lc")
+        if search_nama:
+            # _nama_lc sudah huruf kecil dari loader; regex=False = pencarian substring biasa
+            mask = df_anggota["_nama_lc"].str.contains(
+                search_nama.lower(), regex=False, na=False
+            )
+            df_anggota_view = df_anggota.loc[mask, cols]
+        else:
+            df_anggota_view = df_anggota[cols]
 
-    with st.expander("Tabel data anggota"):
-        st.dataframe(df_anggota_view, use_container_width=True, height=350)
+        with st.expander("Tabel data anggota"):
+            show_table(df_anggota_view, key="baris_anggota")
 
-    csv_anggota = df_anggota_view.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        label="Unduh data anggota (CSV)",
-        data=csv_anggota,
-        file_name="anggota.csv",
-        mime="text/csv",
-    )
+        show_download(
+            df_anggota_view, "anggota", "data anggota", lengkap=not search_nama
+        )
 
-    col1, col2 = st.columns(2)
+        grafik = anggota_charts(df_anggota_view, repr(search_nama))
 
-    with col1:
-        st.subheader("Jumlah anggota per status")
-        fig_status = chart_anggota_per_status(df_anggota_view)
-        st.plotly_chart(fig_status, use_container_width=True)
+        col1, col2 = st.columns(2)
 
-    with col2:
-        st.subheader("Jumlah anggota per fakultas")
-        fig_fak = chart_anggota_per_fakultas(df_anggota_view)
-        st.plotly_chart(fig_fak, use_container_width=True)
+        with col1:
+            st.subheader("Jumlah anggota per status")
+            fig_status = grafik["status"]
+            st.plotly_chart(fig_status, use_container_width=True)
+
+        with col2:
+            st.subheader("Jumlah anggota per fakultas")
+            fig_fak = grafik["fakultas"]
+            st.plotly_chart(fig_fak, use_container_width=True, config=PLOTLY_CONFIG_STATIS)
+
+    anggota_view(df_anggota)
 
     with st.expander("Penjelasan dan kesimpulan halaman Anggota"):
         st.markdown(
@@ -546,74 +784,86 @@ elif page == "Buku":
         st.warning("Belum ada data buku pada database.")
         st.stop()
 
-    # Pencarian judul buku
-    search_judul = st.text_input(
-        "Pencarian judul buku",
-        placeholder="Ketik judul atau sebagian judul buku...",
-    )
-    df_buku_view = df_buku.copy()
-    if search_judul:
-        df_buku_view = df_buku_view[
-            df_buku_view["judul"].str.contains(search_judul, case=False, na=False)
+    # Sama seperti halaman Anggota: pencarian + filter + grafik sebagai fragment.
+    @st.fragment
+    def buku_view(df_buku):
+        # Pencarian judul buku
+        search_judul = st.text_input(
+            "Pencarian judul buku",
+            placeholder="Ketik judul atau sebagian judul buku...",
+        )
+        # Urutan kolom: tampilkan kode_* sebelum eksemplar
+        cols_order = [
+            "id_buku",
+            "kode_judul",
+            "judul",
+            "kode_klasifikasi",
+            "kategori_buku",
+            "kode_pengarang",
+            "tahun_terbit",
+            "isbn",
+            "status_buku",
+            "eksemplar",
         ]
+        existing_cols = [c for c in cols_order if c in df_buku.columns]
+
+        # Filter kategori dan status buku
+        kategori_list = ["(Semua)"] + opsi_filter(df_buku["kategori_buku"])
+        status_buku_list = ["(Semua)"] + opsi_filter(df_buku["status_buku"])
+
+        col_filter1, col_filter2 = st.columns(2)
+        with col_filter1:
+            kategori_pilih = st.selectbox("Kategori buku", kategori_list)
+        with col_filter2:
+            status_buku_pilih = st.selectbox("Status buku", status_buku_list)
+
+        # Pencarian + filter digabung jadi satu mask atas df_buku, lalu baris dan
+        # kolom (existing_cols, tanpa _judul_lc) dipilih sekali: hanya satu salinan.
+        mask = pd.Series(True, index=df_buku.index)
+        if search_judul:
+            mask &= df_buku["_judul_lc"].str.contains(
+                search_judul.lower(), regex=False, na=False
+            )
+        if kategori_pilih != "(Semua)":
+            mask &= df_buku["kategori_buku"] == kategori_pilih
+        if status_buku_pilih != "(Semua)":
+            mask &= df_buku["status_buku"] == status_buku_pilih
+
+        df_buku_view = df_buku.loc[mask, existing_cols]
+
+        with st.expander("Tabel data buku"):
+            show_table(df_buku_view, key="baris_buku")
+
+        show_download(
+            df_buku_view,
+            "buku",
+            "data buku",
+            lengkap=not search_judul
+            and kategori_pilih == "(Semua)"
+            and status_buku_pilih == "(Semua)",
+        )
 
-    # Urutan kolom: tampilkan kode_* sebelum eksemplar
-    cols_order = [
-        "id_buku",
-        "kode_judul",
-        "judul",
-        "kode_klasifikasi",
-        "kategori_buku",
-        "kode_pengarang",
-        "tahun_terbit",
-        "isbn",
-        "status_buku",
-        "eksemplar",
-    ]
-    existing_cols = [c for c in cols_order if c in df_buku_view.columns]
-    df_buku_view = df_buku_view[existing_cols]
-
-    # Filter kategori dan status buku
-    kategori_list = ["(Semua)"] + sorted(df_buku["kategori_buku"].dropna().unique().tolist())
-    status_buku_list = ["(Semua)"] + sorted(df_buku["status_buku"].dropna().unique().tolist())
-
-    col_filter1, col_filter2 = st.columns(2)
-    with col_filter1:
-        kategori_pilih = st.selectbox("Kategori buku", kategori_list)
-    with col_filter2:
-        status_buku_pilih = st.selectbox("Status buku", status_buku_list)
-
-    if kategori_pilih != "(Semua)":
-        df_buku_view = df_buku_view[df_buku_view["kategori_buku"] == kategori_pilih]
-    if status_buku_pilih != "(Semua)":
-        df_buku_view = df_buku_view[df_buku_view["status_buku"] == status_buku_pilih]
-
-    with st.expander("Tabel data buku"):
-        st.dataframe(df_buku_view, use_container_width=True, height=350)
-
-    csv_buku = df_buku_view.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        label="Unduh data buku (CSV)",
-        data=csv_buku,
-        file_name="buku.csv",
-        mime="text/csv",
-    )
+        grafik = buku_charts(
+            df_buku_view, repr((search_judul, kategori_pilih, status_buku_pilih))
+        )
 
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
 
-    with col1:
-        st.subheader("Jumlah buku per kategori")
-        fig_kat = chart_buku_per_kategori(df_buku_view)
-        st.plotly_chart(fig_kat, use_container_width=True)
+        with col1:
+            st.subheader("Jumlah buku per kategori")
+            fig_kat = grafik["kategori"]
+            st.plotly_chart(fig_kat, use_container_width=True)
 
-    with col2:
-        st.subheader("Komposisi status koleksi buku")
-        fig_status_buku, _ = chart_buku_per_status(df_buku_view)
-        st.plotly_chart(fig_status_buku, use_container_width=True)
+        with col2:
+            st.subheader("Komposisi status koleksi buku")
+            fig_status_buku, _ = grafik["status"]
+            st.plotly_chart(fig_status_buku, use_container_width=True)
+
+        st.subheader("Jumlah buku per tahun terbit")
+        fig_th = grafik["tahun"]
+        st.plotly_chart(fig_th, use_container_width=True)
 
-    st.subheader("Jumlah buku per tahun terbit")
-    fig_th = chart_buku_per_tahun(df_buku_view)
-    st.plotly_chart(fig_th, use_container_width=True)
+    buku_view(df_buku)
 
     with st.expander("Penjelasan dan kesimpulan halaman Buku"):
         st.markdown(
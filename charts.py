@@ -11,10 +11,14 @@ Catatan:
 
 from __future__ import annotations
 
-import plotly.express as px
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 # ==========================
 # Palet warna “perpustakaan”
 # ==========================
@@ -35,40 +39,101 @@ GRID_COLOR = "#3A2A18"      # garis grid cokelat lembut
 AXIS_LINE = "#8C663E"       # garis sumbu warna leather
 FONT_COLOR = "#F9FAFB"
 
+# Jumlah bin histogram durasi
+HIST_BINS = 10
+# rentang nilai integer maksimum yang masih dihitung dengan np.bincount
+MAKS_RENTANG_BINCOUNT = 10_000
+
+
+# Layout seragam untuk semua grafik (tanpa background solid). Dibuat sekali
+# saat import; _apply_common_layout hanya meneruskannya ke Plotly, yang
+# menyalin isinya ke figure (dict di sini tidak ikut berubah).
+COMMON_LAYOUT = dict(
+    title_font=dict(color=FONT_COLOR, size=18),
+    plot_bgcolor=PLOT_BG,
+    paper_bgcolor=PAPER_BG,
+    font=dict(color=FONT_COLOR),
+    legend=dict(
+        bgcolor="rgba(32,14,3,0.85)",   # panel legenda cokelat transparan
+        bordercolor="#57391B",
+        borderwidth=1,
+    ),
+    margin=dict(l=40, r=20, t=60, b=40),
+)
+COMMON_AXIS = dict(
+    gridcolor=GRID_COLOR,
+    zerolinecolor=GRID_COLOR,
+    linecolor=AXIS_LINE,
+    showline=True,
+)
+
 
 def _apply_common_layout(fig: go.Figure, title: str | None = None) -> go.Figure:
     """Layout seragam untuk semua grafik (tanpa background solid)."""
+    # title sebagai dict: string `title` akan mengganti seluruh objek judul,
+    # termasuk title_font dari COMMON_LAYOUT
     fig.update_layout(
-        title=title or "",
-        title_font=dict(color=FONT_COLOR, size=18),
-        plot_bgcolor=PLOT_BG,
-        paper_bgcolor=PAPER_BG,
-        font=dict(color=FONT_COLOR),
-        legend=dict(
-            bgcolor="rgba(32,14,3,0.85)",   # panel legenda cokelat transparan
-            bordercolor="#57391B",
-            borderwidth=1,
-        ),
-        margin=dict(l=40, r=20, t=60, b=40),
-    )
-    fig.update_xaxes(
-        gridcolor=GRID_COLOR,
-        zerolinecolor=GRID_COLOR,
-        linecolor=AXIS_LINE,
-        showline=True,
-    )
-    fig.update_yaxes(
-        gridcolor=GRID_COLOR,
-        zerolinecolor=GRID_COLOR,
-        linecolor=AXIS_LINE,
-        showline=True,
+        COMMON_LAYOUT,
+        title=dict(text=title or "", font=COMMON_LAYOUT["title_font"]),
     )
+    fig.update_xaxes(COMMON_AXIS)
+    fig.update_yaxes(COMMON_AXIS)
     return fig
 
 
+def _px():
+    """
+    Modul plotly.express, di-import saat grafik pertama dibuat, bukan saat
+    charts.py di-import: halaman/rerun yang tidak menggambar grafik tidak
+    ikut membayar waktu import Plotly. Import berikutnya hanya lookup
+    sys.modules.
+    """
+    import plotly.express as px
+    return px
+
+
+def _warna_kategori(n: int) -> list[str]:
+    """Warna PALETTE berurutan (berulang) untuk n kategori, seperti px."""
+    return [PALETTE[i % len(PALETTE)] for i in range(n)]
+
+
+def _bar_per_kategori(
+    df: pd.DataFrame, x: str, y: str, orientation: str = "v"
+) -> go.Figure:
+    """
+    go.Bar untuk agregat kecil (satu baris per kategori), setara
+    px.bar(df, x, y, color=<kolom kategori>) tanpa pipeline plotly.express
+    (validasi/salin DataFrame, inferensi tipe). Seperti px, satu trace per
+    kategori dengan warna PALETTE berurutan, sehingga legenda per kategori
+    tetap bisa dibaca dan diklik.
+    """
+    import plotly.graph_objects as go
+
+    kolom_kategori = x if orientation == "v" else y
+    label = df[kolom_kategori].astype(str).to_numpy()
+    nilai_x = df[x].to_numpy()
+    nilai_y = df[y].to_numpy()
+    fig = go.Figure()
+    for i, warna in enumerate(_warna_kategori(len(df))):
+        fig.add_trace(
+            go.Bar(
+                x=nilai_x[i:i + 1],
+                y=nilai_y[i:i + 1],
+                name=label[i],
+                orientation=orientation,
+                marker_color=warna,
+                hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>",
+            )
+        )
+    # seperti px: satu batang per trace, jadi tidak digeser seperti mode "group"
+    fig.update_layout(barmode="relative", legend_title_text=kolom_kategori)
+    return fig
+
 
 def _empty_fig(title: str, message: str) -> go.Figure:
     """Figure placeholder ketika tidak ada data / kolom yang dibutuhkan."""
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     fig.add_annotation(
         text=message,
@@ -85,32 +150,101 @@ def _empty_fig(title: str, message: str) -> go.Figure:
     return _apply_common_layout(fig, title)
 
 
+def _value_counts(s: pd.Series, sort: bool = True) -> pd.DataFrame:
+    """
+    Series.value_counts() sebagai DataFrame (kolom s.name dan jumlah), urut
+    menurun bila sort=True. Kategori yang tidak muncul (jumlah 0, khas kolom
+    category setelah difilter) dibuang, sama seperti groupby(observed=True).
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Kolom category (status, fakultas, ...): np.bincount langsung pada kode
+        # integer (satu lintasan, tanpa sort/objek GroupBy); kode -1 = NULL.
+        codes = s.cat.codes.to_numpy()
+        jumlah = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories))
+        kode = np.flatnonzero(jumlah)
+        hasil = pd.DataFrame({
+            s.name: pd.Categorical.from_codes(kode, dtype=s.dtype),
+            "jumlah": jumlah[kode],
+        })
+    elif (
+        pd.api.types.is_integer_dtype(s.dtype)
+        and len(s)
+        and not s.hasnans
+        and int(s.max()) - int(s.min()) < MAKS_RENTANG_BINCOUNT
+    ):
+        # Integer dengan rentang sempit (tahun_terbit): bincount atas offset.
+        # dtype eksplisit: kolom Int16/Int32 (nullable) tanpa NA menjadi
+        # array numpy biasa, bukan array objek yang ditolak np.bincount.
+        nilai = s.to_numpy(dtype="int64")
+        minimum = int(nilai.min())
+        jumlah = np.bincount(nilai - minimum)
+        offset = np.flatnonzero(jumlah)
+        hasil = pd.DataFrame({
+            # pd.array: dtype extension (Int16/Int32) tidak bisa dipakai astype numpy
+            s.name: pd.array(offset + minimum, dtype=s.dtype),
+            "jumlah": jumlah[offset],
+        })
+    else:
+        vc = s.value_counts(sort=sort)
+        vc = vc[vc > 0]
+        return vc.rename_axis(s.name).reset_index(name="jumlah")
+
+    if sort:
+        hasil = hasil.sort_values("jumlah", ascending=False, kind="stable")
+    return hasil.reset_index(drop=True)
+
+
 # ============================================================
 # 1. RINGKASAN / PEMINJAMAN
 # ============================================================
 
-def chart_tren_bulanan_status(df_pinjam: pd.DataFrame) -> go.Figure:
+def agregat_tren_bulanan(df_pinjam: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jumlah peminjaman per bulan dan status dari data detail.
+    Kolom: bulan ("YYYY-MM"), status_peminjaman, jumlah
+    (bentuk yang sama dengan db.load_agg_ringkasan()["tren"]).
+    """
+    # Kunci bulan = awal bulan sebagai datetime64 (satu cast numpy atas buffer
+    # int64), bukan objek Period per baris; label "YYYY-MM" dibuat pada hasil
+    # agregat, bukan per transaksi.
+    bulan = pd.Series(
+        df_pinjam["tgl_pinjam"].to_numpy().astype("datetime64[M]"),
+        index=df_pinjam.index,
+        name="bulan",
+    )
+    per_bulan_status = (
+        df_pinjam.groupby([bulan, "status_peminjaman"], observed=True)
+          .size()
+          .reset_index(name="jumlah")
+    )
+    per_bulan_status["bulan"] = per_bulan_status["bulan"].dt.strftime("%Y-%m")
+    return per_bulan_status
+
+
+def chart_tren_bulanan_status(
+    df_pinjam: pd.DataFrame | None = None, agregat: pd.DataFrame | None = None
+):
     """
     Line chart (dengan area) tren peminjaman per bulan berdasarkan status.
     Menggunakan kolom:
       - tgl_pinjam (datetime)
       - status_peminjaman
+    `agregat` (opsional) = hasil agregat_tren_bulanan / db.load_agg_ringkasan()["tren"];
+    bila diisi, df_pinjam tidak dipakai.
+    Mengembalikan (fig, per_bulan_status) dengan kolom bulan ("YYYY-MM"),
+    status_peminjaman, jumlah.
     """
-    if df_pinjam.empty:
-        return _empty_fig(
+    if agregat is None and df_pinjam is not None and not df_pinjam.empty:
+        agregat = agregat_tren_bulanan(df_pinjam)
+    if agregat is None or agregat.empty:
+        fig = _empty_fig(
             "Perkembangan peminjaman per bulan",
             "Belum ada data peminjaman yang bisa ditampilkan."
         )
+        return fig, pd.DataFrame()
+    per_bulan_status = agregat
 
-    df = df_pinjam.copy()
-    df["bulan"] = df["tgl_pinjam"].dt.to_period("M").astype(str)
-
-    per_bulan_status = (
-        df.groupby(["bulan", "status_peminjaman"])
-          .size()
-          .reset_index(name="jumlah")
-    )
-
+    px = _px()
     fig = px.area(
         per_bulan_status,
         x="bulan",
@@ -121,14 +255,68 @@ def chart_tren_bulanan_status(df_pinjam: pd.DataFrame) -> go.Figure:
     fig.update_traces(mode="lines+markers")
     fig.update_xaxes(title_text="Bulan")
     fig.update_yaxes(title_text="Jumlah peminjaman")
-    return _apply_common_layout(fig, "Perkembangan peminjaman per bulan berdasarkan status")
+    fig = _apply_common_layout(fig, "Perkembangan peminjaman per bulan berdasarkan status")
+    return fig, per_bulan_status
 
 
-def chart_peminjaman_per_fakultas(df_pinjam: pd.DataFrame):
+def agregat_per_fakultas(df_pinjam: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jumlah peminjaman dan rata-rata durasi per fakultas dalam satu fungsi,
+    sehingga kolom nama_fakultas hanya dibaca sekali. Hasilnya bisa dipakai
+    bersama oleh chart_peminjaman_per_fakultas dan chart_durasi_rata_per_fakultas.
+    Kolom: nama_fakultas, jumlah, rata_durasi (jika durasi_peminjaman ada)
+    (bentuk yang sama dengan db.load_agg_ringkasan()["fakultas"]).
+    """
+    fakultas = df_pinjam["nama_fakultas"]
+    if not isinstance(fakultas.dtype, pd.CategoricalDtype):
+        g = df_pinjam.groupby("nama_fakultas", observed=True, sort=False)
+        agregat = g.size().rename("jumlah").to_frame()
+        if "durasi_peminjaman" in df_pinjam.columns:
+            agregat["rata_durasi"] = g["durasi_peminjaman"].mean()
+        return agregat.reset_index()
+
+    # Kolom category: jumlah dan rata-rata lewat np.bincount atas kode
+    # fakultas (dengan weights untuk total durasi), tanpa hashing/GroupBy.
+    codes = fakultas.cat.codes.to_numpy()
+    k = len(fakultas.cat.categories)
+    ada = codes >= 0
+    jumlah = np.bincount(codes[ada], minlength=k)
+    kode = np.flatnonzero(jumlah)
+    agregat = pd.DataFrame({
+        "nama_fakultas": pd.Categorical.from_codes(kode, dtype=fakultas.dtype),
+        "jumlah": jumlah[kode],
+    })
+    if "durasi_peminjaman" in df_pinjam.columns:
+        durasi = df_pinjam["durasi_peminjaman"]
+        ada &= durasi.notna().to_numpy()
+        total = np.bincount(
+            codes[ada],
+            weights=durasi.to_numpy(dtype="float64", na_value=np.nan)[ada],
+            minlength=k,
+        )
+        n_durasi = np.bincount(codes[ada], minlength=k)
+        # fakultas yang semua durasinya NULL -> NaN, sama seperti GroupBy.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            agregat["rata_durasi"] = (total / n_durasi)[kode]
+    return agregat
+
+
+def chart_peminjaman_per_fakultas(
+    df_pinjam: pd.DataFrame | None = None, agregat: pd.DataFrame | None = None
+):
     """
     Bar chart jumlah peminjaman per fakultas.
+    `agregat` (opsional) = hasil agregat_per_fakultas atau
+    db.load_agg_ringkasan()["fakultas"]; bila diisi, df_pinjam tidak dipakai.
     """
-    if df_pinjam.empty or "nama_fakultas" not in df_pinjam.columns:
+    if (
+        agregat is None
+        and df_pinjam is not None
+        and not df_pinjam.empty
+        and "nama_fakultas" in df_pinjam.columns
+    ):
+        agregat = agregat_per_fakultas(df_pinjam)
+    if agregat is None or agregat.empty:
         fig = _empty_fig(
             "Peminjaman per fakultas",
             "Kolom nama_fakultas tidak ditemukan atau data kosong."
@@ -136,63 +324,75 @@ def chart_peminjaman_per_fakultas(df_pinjam: pd.DataFrame):
         return fig, pd.DataFrame()
 
     per_fak = (
-        df_pinjam.groupby("nama_fakultas")
-        .size()
-        .reset_index(name="jumlah")
+        agregat[["nama_fakultas", "jumlah"]]
         .sort_values("jumlah", ascending=False)
     )
 
-    fig = px.bar(
-        per_fak,
-        x="nama_fakultas",
-        y="jumlah",
-        color="nama_fakultas",
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(per_fak, "nama_fakultas", "jumlah")
     fig.update_xaxes(title_text="Fakultas")
     fig.update_yaxes(title_text="Jumlah peminjaman")
     fig = _apply_common_layout(fig, "Peminjaman per fakultas")
     return fig, per_fak
 
 
-def chart_peminjaman_per_kategori(df_pinjam: pd.DataFrame):
+def chart_peminjaman_per_kategori(
+    df_pinjam: pd.DataFrame | None = None, agregat: pd.DataFrame | None = None
+):
     """
     Donut chart komposisi peminjaman per kategori_buku.
+    `agregat` (opsional) = jumlah per kategori (kolom kategori_buku, jumlah),
+    mis. dari db.load_agg_ringkasan()["kategori"]; bila diisi, df_pinjam tidak dipakai.
     """
-    if df_pinjam.empty or "kategori_buku" not in df_pinjam.columns:
+    if (
+        agregat is None
+        and df_pinjam is not None
+        and not df_pinjam.empty
+        and "kategori_buku" in df_pinjam.columns
+    ):
+        agregat = _value_counts(df_pinjam["kategori_buku"])
+    if agregat is None or agregat.empty:
         fig = _empty_fig(
             "Peminjaman per kategori buku",
             "Kolom kategori_buku tidak ditemukan atau data kosong."
         )
         return fig, pd.DataFrame()
 
-    per_kat = (
-        df_pinjam.groupby("kategori_buku")
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
-    )
+    per_kat = agregat
 
-    fig = px.pie(
-        per_kat,
-        names="kategori_buku",
-        values="jumlah",
-        hole=0.5,
-        color="kategori_buku",
-        color_discrete_sequence=PALETTE,
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Pie(
+            labels=per_kat["kategori_buku"].to_numpy(),
+            values=per_kat["jumlah"].to_numpy(),
+            hole=0.5,
+            marker_colors=_warna_kategori(len(per_kat)),
+            hovertemplate="kategori_buku=%{label}<br>jumlah=%{value}<extra></extra>",
+        )
     )
     fig = _apply_common_layout(fig, "Peminjaman per kategori buku")
     return fig, per_kat
 
 
-def chart_durasi_rata_per_fakultas(df_pinjam: pd.DataFrame):
+def chart_durasi_rata_per_fakultas(
+    df_pinjam: pd.DataFrame | None = None, agregat: pd.DataFrame | None = None
+):
     """
     Bar chart rata-rata durasi peminjaman per fakultas.
     Menggunakan kolom:
       - nama_fakultas
       - durasi_peminjaman
+    `agregat` (opsional) = hasil agregat_per_fakultas atau
+    db.load_agg_ringkasan()["fakultas"]; bila diisi, df_pinjam tidak dipakai.
     """
-    if df_pinjam.empty or "durasi_peminjaman" not in df_pinjam.columns:
+    if (
+        agregat is None
+        and df_pinjam is not None
+        and not df_pinjam.empty
+        and "durasi_peminjaman" in df_pinjam.columns
+    ):
+        agregat = agregat_per_fakultas(df_pinjam)
+    if agregat is None or agregat.empty or "rata_durasi" not in agregat.columns:
         fig = _empty_fig(
             "Rata-rata durasi peminjaman per fakultas",
             "Kolom durasi_peminjaman tidak ditemukan atau data kosong."
@@ -200,19 +400,11 @@ def chart_durasi_rata_per_fakultas(df_pinjam: pd.DataFrame):
         return fig, pd.DataFrame()
 
     durasi_fak = (
-        df_pinjam.groupby("nama_fakultas")["durasi_peminjaman"]
-        .mean()
-        .reset_index(name="rata_durasi")
+        agregat[["nama_fakultas", "rata_durasi"]]
         .sort_values("rata_durasi", ascending=False)
     )
 
-    fig = px.bar(
-        durasi_fak,
-        x="nama_fakultas",
-        y="rata_durasi",
-        color="nama_fakultas",
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(durasi_fak, "nama_fakultas", "rata_durasi")
     fig.update_xaxes(title_text="Fakultas")
     fig.update_yaxes(title_text="Rata-rata durasi (hari)")
     fig = _apply_common_layout(fig, "Rata-rata durasi peminjaman per fakultas")
@@ -222,6 +414,7 @@ def chart_durasi_rata_per_fakultas(df_pinjam: pd.DataFrame):
 def chart_hist_durasi(df_pinjam: pd.DataFrame):
     """
     Histogram distribusi durasi_peminjaman.
+    Mengembalikan (fig, per_bin) dengan kolom batas_bawah, batas_atas, jumlah.
     """
     if df_pinjam.empty or "durasi_peminjaman" not in df_pinjam.columns:
         fig = _empty_fig(
@@ -230,25 +423,49 @@ def chart_hist_durasi(df_pinjam: pd.DataFrame):
         )
         return fig, pd.DataFrame()
 
-    df = df_pinjam[df_pinjam["durasi_peminjaman"].notna()].copy()
-    if df.empty:
+    # durasi bisa int (tanpa NULL) atau Int32 nullable; nilainya selalu bulat
+    durasi = df_pinjam["durasi_peminjaman"].dropna().to_numpy(dtype="int64")
+    if durasi.size == 0:
         fig = _empty_fig(
             "Distribusi durasi peminjaman",
             "Semua durasi_peminjaman bernilai NULL."
         )
         return fig, pd.DataFrame()
 
-    fig = px.histogram(
-        df,
-        x="durasi_peminjaman",
-        nbins=10,
-        color_discrete_sequence=[PALETTE[1]],
+    # Bin dihitung di server; browser hanya menerima paling banyak HIST_BINS
+    # batang, bukan satu nilai per transaksi untuk dibin ulang. Durasi berupa
+    # hari bulat, jadi lebar bin juga bilangan bulat: setiap bin mencakup
+    # jumlah nilai hari yang sama (tanpa efek gergaji dari batas pecahan) dan
+    # satu nilai hari hanya masuk ke satu bin.
+    terkecil = int(durasi.min())
+    lebar = max(1, -(-(int(durasi.max()) - terkecil + 1) // HIST_BINS))
+    counts = np.bincount((durasi - terkecil) // lebar)
+    batas_bawah = terkecil + lebar * np.arange(counts.size)
+    batas_atas = batas_bawah + lebar - 1  # inklusif
+    per_bin = pd.DataFrame({
+        "batas_bawah": batas_bawah,
+        "batas_atas": batas_atas,
+        "jumlah": counts,
+    })
+
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Bar(
+            # batang dari batas_bawah-0.5 sampai batas_atas+0.5
+            x=(batas_bawah + batas_atas) / 2,
+            y=counts,
+            width=lebar,
+            marker_color=PALETTE[1],
+            customdata=np.column_stack([batas_bawah, batas_atas]),
+            hovertemplate="%{customdata[0]}–%{customdata[1]} hari: %{y}<extra></extra>",
+        )
     )
+    fig.update_layout(bargap=0)
     fig.update_xaxes(title_text="Durasi peminjaman (hari)")
     fig.update_yaxes(title_text="Jumlah peminjaman")
     fig = _apply_common_layout(fig, "Distribusi durasi peminjaman")
-    # Data agregat sederhana (jumlah per bin tidak kita kembalikan di sini)
-    return fig, df[["durasi_peminjaman"]]
+    return fig, per_bin
 
 
 def chart_scatter_durasi_denda(df_pinjam: pd.DataFrame) -> go.Figure:
@@ -262,8 +479,7 @@ def chart_scatter_durasi_denda(df_pinjam: pd.DataFrame) -> go.Figure:
             "Kolom durasi_peminjaman atau denda_buku tidak ditemukan."
         )
 
-    df = df_pinjam.copy()
-    df = df[df["durasi_peminjaman"].notna()]
+    df = df_pinjam.dropna(subset=["durasi_peminjaman"])
 
     if df.empty:
         return _empty_fig(
@@ -271,6 +487,7 @@ def chart_scatter_durasi_denda(df_pinjam: pd.DataFrame) -> go.Figure:
             "Belum ada data durasi & denda yang bisa ditampilkan."
         )
 
+    px = _px()
     fig = px.scatter(
         df,
         x="durasi_peminjaman",
@@ -298,20 +515,9 @@ def chart_peminjaman_per_status(df_filtered: pd.DataFrame):
         )
         return fig, pd.DataFrame()
 
-    per_status = (
-        df_filtered.groupby("status_peminjaman")
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
-    )
+    per_status = _value_counts(df_filtered["status_peminjaman"])
 
-    fig = px.bar(
-        per_status,
-        x="status_peminjaman",
-        y="jumlah",
-        color="status_peminjaman",
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(per_status, "status_peminjaman", "jumlah")
     fig.update_xaxes(title_text="Status peminjaman")
     fig.update_yaxes(title_text="Jumlah peminjaman")
     fig = _apply_common_layout(fig, "Peminjaman per status peminjaman")
@@ -329,13 +535,27 @@ def chart_top5_judul(df_filtered: pd.DataFrame):
         )
         return fig, pd.DataFrame()
 
-    top_judul = (
-        df_filtered.groupby("judul")
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
-        .head(5)
-    )
+    judul = df_filtered["judul"]
+    if isinstance(judul.dtype, pd.CategoricalDtype):
+        # Jumlah per kode judul dengan np.bincount, lalu urutkan hanya judul
+        # yang muncul: jumlah menurun, seri diputus urutan kategori (judul
+        # menaik, karena astype("category") mengurutkan kategorinya).
+        codes = judul.cat.codes.to_numpy()
+        jumlah = np.bincount(codes[codes >= 0], minlength=len(judul.cat.categories))
+        kode = np.flatnonzero(jumlah)
+        idx = kode[np.lexsort((kode, -jumlah[kode]))][:5]
+        top_judul = pd.DataFrame({
+            "judul": pd.Categorical.from_codes(idx, dtype=judul.dtype),
+            "jumlah": jumlah[idx],
+        })
+    else:
+        # urutan yang sama dengan cabang category: jumlah menurun, lalu judul
+        top_judul = (
+            _value_counts(judul, sort=False)
+            .sort_values(["jumlah", "judul"], ascending=[False, True], kind="stable")
+            .head(5)
+            .reset_index(drop=True)
+        )
 
     if top_judul.empty:
         fig = _empty_fig(
@@ -344,13 +564,22 @@ def chart_top5_judul(df_filtered: pd.DataFrame):
         )
         return fig, top_judul
 
-    fig = px.bar(
-        top_judul,
-        x="jumlah",
-        y="judul",
-        orientation="h",
-        color="jumlah",
-        color_continuous_scale=[PALETTE[0], PALETTE[1]],
+    import plotly.graph_objects as go
+
+    jumlah_top = top_judul["jumlah"].to_numpy()
+    fig = go.Figure(
+        go.Bar(
+            x=jumlah_top,
+            y=top_judul["judul"].to_numpy(),
+            orientation="h",
+            marker=dict(
+                color=jumlah_top,
+                colorscale=[PALETTE[0], PALETTE[1]],
+                showscale=True,
+                colorbar=dict(title="jumlah"),
+            ),
+            hovertemplate="jumlah=%{x}<br>judul=%{y}<extra></extra>",
+        )
     )
     fig.update_xaxes(title_text="Jumlah peminjaman")
     fig.update_yaxes(title_text="Judul buku", autorange="reversed")
@@ -372,19 +601,9 @@ def chart_anggota_per_status(df_anggota_view: pd.DataFrame) -> go.Figure:
             "Kolom status_anggota tidak ditemukan atau data kosong."
         )
 
-    per_status = (
-        df_anggota_view.groupby("status_anggota")
-        .size()
-        .reset_index(name="jumlah")
-    )
+    per_status = _value_counts(df_anggota_view["status_anggota"], sort=False)
 
-    fig = px.bar(
-        per_status,
-        x="status_anggota",
-        y="jumlah",
-        color="status_anggota",
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(per_status, "status_anggota", "jumlah")
     fig.update_xaxes(title_text="Status anggota")
     fig.update_yaxes(title_text="Jumlah anggota")
     return _apply_common_layout(fig, "Jumlah anggota per status")
@@ -400,12 +619,11 @@ def chart_anggota_per_fakultas(df_anggota_view: pd.DataFrame) -> go.Figure:
             "Kolom nama_fakultas tidak ditemukan atau data kosong."
         )
 
-    per_fak = (
-        df_anggota_view.groupby("nama_fakultas")
-        .size()
-        .reset_index(name="jumlah")
-    )
+    per_fak = _value_counts(df_anggota_view["nama_fakultas"], sort=False)
+    # path treemap dibangun dari string biasa, bukan kategori
+    per_fak["nama_fakultas"] = per_fak["nama_fakultas"].astype(str)
 
+    px = _px()
     fig = px.treemap(
         per_fak,
         path=["nama_fakultas"],
@@ -430,21 +648,9 @@ def chart_buku_per_kategori(df_buku_view: pd.DataFrame) -> go.Figure:
             "Kolom kategori_buku tidak ditemukan atau data kosong."
         )
 
-    per_kat = (
-        df_buku_view.groupby("kategori_buku")
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
-    )
+    per_kat = _value_counts(df_buku_view["kategori_buku"])
 
-    fig = px.bar(
-        per_kat,
-        x="jumlah",
-        y="kategori_buku",
-        orientation="h",
-        color="kategori_buku",
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(per_kat, "jumlah", "kategori_buku", orientation="h")
     fig.update_xaxes(title_text="Jumlah buku")
     fig.update_yaxes(title_text="Kategori buku", autorange="reversed")
     return _apply_common_layout(fig, "Jumlah buku per kategori")
@@ -461,12 +667,11 @@ def chart_buku_per_tahun(df_buku_view: pd.DataFrame) -> go.Figure:
         )
 
     per_tahun = (
-        df_buku_view.groupby("tahun_terbit")
-        .size()
-        .reset_index(name="jumlah")
+        _value_counts(df_buku_view["tahun_terbit"], sort=False)
         .sort_values("tahun_terbit")
     )
 
+    px = _px()
     fig = px.line(
         per_tahun,
         x="tahun_terbit",
@@ -498,12 +703,7 @@ def chart_buku_per_status(df_buku_view: pd.DataFrame):
         )
         return fig, pd.DataFrame()
 
-    per_status = (
-        df_buku_view.groupby(status_col)
-        .size()
-        .reset_index(name="jumlah")
-        .sort_values("jumlah", ascending=False)
-    )
+    per_status = _value_counts(df_buku_view[status_col])
 
     if per_status.empty:
         fig = _empty_fig(
@@ -512,13 +712,7 @@ def chart_buku_per_status(df_buku_view: pd.DataFrame):
         )
         return fig, per_status
 
-    fig = px.bar(
-        per_status,
-        x=status_col,
-        y="jumlah",
-        color=status_col,
-        color_discrete_sequence=PALETTE,
-    )
+    fig = _bar_per_kategori(per_status, status_col, "jumlah")
     fig.update_xaxes(title_text="Status buku")
     fig.update_yaxes(title_text="Jumlah buku")
     fig = _apply_common_layout(fig, "Kondisi / status koleksi buku")
@@ -4,48 +4,240 @@ Modul koneksi dan pemuatan data dari MySQL untuk dashboard Seperlima.
 Semua query menggunakan tabel dasar (tanpa VIEW).
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import quote_plus
+
 import streamlit as st
 import pandas as pd
-import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+try:
+    # opsional: pembaca MySQL berbasis Arrow, jauh lebih cepat untuk tabel besar
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+# Batas umur cache loader (detik). Data dimuat ulang dari MySQL setelah lewat.
+# Loader tabel referensi memakai persist="disk" (bertahan saat server restart);
+# Streamlit tidak mendukung TTL untuk cache persist, jadi tanpa CACHE_TTL.
+CACHE_TTL = 3600
+
+# Kolom teks berkardinalitas rendah yang disimpan sebagai dtype "category":
+# filter == dan groupby cukup membandingkan kode integer, bukan string.
+CATEGORY_COLS = (
+    "nama_fakultas",
+    "nama_prodi",
+    "jenjang",
+    "status_anggota",
+    "status_peminjaman",
+    "kategori_buku",
+    "status_buku",
+    "judul",
+)
+
+
+def _as_category(df):
+    """Ubah kolom CATEGORY_COLS yang ada di df menjadi dtype category."""
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+# Kolom angka bulat yang diperkecil ke dtype integer tersempit (int8/16/32).
+# Kolom yang berisi NULL terbaca sebagai float64 dan dibiarkan: float32 tidak
+# cukup presisi untuk total denda dalam rupiah.
+INT_COLS = (
+    "id_peminjaman",
+    "id_anggota",
+    "id_buku",
+    "id_petugas",
+    "durasi_peminjaman",
+    "denda_buku",
+    "tahun_terbit",
+    "eksemplar",
+)
+
+
+# Kolom INT_COLS yang boleh NULL dan cukup 32-bit: bila berisi NULL (terbaca
+# float64) disimpan sebagai Int32 nullable, bukan float64 (setengah ukurannya).
+NULLABLE_INT32_COLS = ("durasi_peminjaman",)
+
+
+def _downcast_ints(df):
+    """Perkecil dtype kolom INT_COLS yang bertipe integer di df."""
+    for col in INT_COLS:
+        if col not in df.columns:
+            continue
+        if df[col].dtype.kind in "iu":
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        elif col in NULLABLE_INT32_COLS and df[col].dtype.kind == "f":
+            df[col] = df[col].astype("Int32")
+    return df
+
 
+# Konfigurasi koneksi MySQL. Sesuaikan user/password jika berbeda.
+MYSQL_CONFIG = {
+    "host": "localhost",
+    "port": 3306,
+    "user": "root",
+    "password": "",           # isi jika MySQL memakai password
+    "database": "seperlima",  # nama database
+}
+# URL untuk connectorx; user/password di-encode supaya karakter seperti
+# @ : / # di password tidak merusak URL.
+MYSQL_URL = "mysql://{user}:{password}@{host}:{port}/{database}".format(
+    **{
+        **MYSQL_CONFIG,
+        "user": quote_plus(MYSQL_CONFIG["user"]),
+        "password": quote_plus(MYSQL_CONFIG["password"]),
+    }
+)
 
-def get_connection():
+
+# Ukuran pool koneksi. MySQLConnectionPool.get_connection tidak menunggu: bila
+# semua slot terpakai ia langsung melempar PoolError. Semaphore ini membuat
+# peminjam menunggu slot kosong (paling lama POOL_TIMEOUT detik), sehingga
+# beberapa sesi yang memuat halaman bersamaan (Ringkasan meminjam 3 koneksi
+# sekaligus) antre alih-alih gagal.
+POOL_SIZE = 10
+POOL_TIMEOUT = 30
+_POOL_SLOTS = threading.BoundedSemaphore(POOL_SIZE)
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool():
     """
-    Membuat koneksi ke database MySQL lokal.
-    Sesuaikan user/password jika konfigurasi berbeda.
+    Pool koneksi MySQL yang dibuat sekali per proses server Streamlit,
+    sehingga setiap rerun tidak perlu membuka koneksi TCP + autentikasi baru.
     """
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",          # isi jika MySQL memakai password
-        database="seperlima"  # nama database
+    return pooling.MySQLConnectionPool(
+        pool_name="seperlima",
+        pool_size=POOL_SIZE,
+        **MYSQL_CONFIG,
     )
 
 
-@st.cache_data
-def load_peminjaman_detail():
+@contextmanager
+def get_connection(pool=None):
+    """
+    Meminjam koneksi dari pool untuk satu blok `with`; koneksi SELALU
+    dikembalikan ke pool saat blok selesai, termasuk bila query (atau ping)
+    gagal. Tanpa itu setiap error menghabiskan satu slot pool secara permanen.
+    Bila pool penuh, menunggu slot kosong (lihat _POOL_SLOTS) alih-alih
+    langsung gagal. Koneksi yang sudah diputus server (idle terlalu lama)
+    disambung ulang. `pool` diisi saat dipanggil dari thread pekerja, supaya thread itu tidak
+    perlu memanggil get_pool() (fungsi Streamlit) sendiri.
+    """
+    pool = pool or get_pool()
+    if not _POOL_SLOTS.acquire(timeout=POOL_TIMEOUT):
+        raise PoolError(
+            f"Tidak ada koneksi MySQL yang bebas setelah {POOL_TIMEOUT} detik."
+        )
+    try:
+        conn = pool.get_connection()
+        try:
+            conn.ping(reconnect=True)
+            yield conn
+        finally:
+            conn.close()
+    finally:
+        _POOL_SLOTS.release()
+
+
+def _read_sql(query, params=None, pool=None):
+    """
+    Jalankan query SELECT dan kembalikan DataFrame.
+
+    Bila connectorx terpasang dan query tanpa parameter, hasil dibaca
+    langsung ke buffer Arrow lewat MYSQL_URL (connectorx membuka koneksinya
+    sendiri, di luar pool). connectorx tidak mendukung parameter %s, jadi
+    query berparameter tetap memakai pd.read_sql pada koneksi dari pool.
+    """
+    if cx is not None and not params:
+        return cx.read_sql(MYSQL_URL, query, return_type="pandas")
+
+    with get_connection(pool) as conn:
+        return pd.read_sql(query, conn, params=params or None)
+
+
+# Status peminjaman diturunkan dari tgl_kembali; dipakai di SELECT dan WHERE.
+STATUS_PEMINJAMAN_SQL = """
+            CASE
+                WHEN p.tgl_kembali IS NULL THEN 'Sedang dipinjam'
+                ELSE 'Selesai'
+            END"""
+
+
+# JOIN peminjaman dengan tabel-tabel terkait; dipakai bersama oleh
+# load_peminjaman_detail dan load_peminjaman_facets.
+PEMINJAMAN_FROM_SQL = """
+        FROM peminjaman p
+        JOIN anggota a ON p.id_anggota = a.id_anggota
+        LEFT JOIN program_studi ps ON a.id_prodi = ps.id_prodi
+        LEFT JOIN fakultas f ON ps.id_fakultas = f.id_fakultas
+        JOIN buku b ON p.id_buku = b.id_buku
+        JOIN judul j ON b.id_judul = j.id_judul
+        JOIN klasifikasi k ON b.id_klasifikasi = k.id_klasifikasi
+        JOIN petugas pt ON p.id_petugas = pt.id_petugas
+    """
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, show_spinner=False)
+def load_peminjaman_detail(
+    start=None,
+    end=None,
+    fakultas=None,
+    prodi=None,
+    status_anggota=None,
+    status_peminjaman=None,
+    kategori=None,
+):
     """
     Mengambil data peminjaman dan menggabungkan dengan anggota, prodi,
     fakultas, buku, judul, klasifikasi, dan petugas.
 
+    Semua argumen opsional; yang bernilai None tidak difilter. Filter yang
+    diisi dijalankan MySQL sebagai klausa WHERE (start/end = rentang tanggal
+    pinjam, inklusif), sehingga hanya baris yang dibutuhkan yang dikirim.
+    Hasil di-cache per kombinasi argumen.
+
     Kolom penting yang dihasilkan antara lain:
     - tgl_pinjam, tgl_kembali, durasi_peminjaman, denda_buku, status_peminjaman
     - nama_anggota, status_anggota, nama_prodi, jenjang, nama_fakultas
     - judul, kategori_buku, tahun_terbit, status_buku, eksemplar
     - nama_petugas
     """
-    conn = get_connection()
-    query = """
+    where = []
+    params = []
+    if start is not None:
+        where.append("p.tgl_pinjam >= %s")
+        params.append(start)
+    if end is not None:
+        where.append("p.tgl_pinjam < %s")
+        params.append(end + timedelta(days=1))
+    for expr, value in [
+        ("f.nama_fakultas", fakultas),
+        ("ps.nama_prodi", prodi),
+        ("a.status", status_anggota),
+        (STATUS_PEMINJAMAN_SQL, status_peminjaman),
+        ("k.kategori_buku", kategori),
+    ]:
+        if value is not None:
+            where.append(f"{expr} = %s")
+            params.append(value)
+
+    query = f"""
         SELECT
             p.id_peminjaman,
             p.tgl_pinjam,
             p.tgl_kembali,
             p.durasi_peminjaman,
-            p.denda_buku,
-            CASE
-                WHEN p.tgl_kembali IS NULL THEN 'Sedang dipinjam'
-                ELSE 'Selesai'
-            END AS status_peminjaman,
+            p.denda_buku,{STATUS_PEMINJAMAN_SQL} AS status_peminjaman,
 
             a.id_anggota,
             a.no_identitas,
@@ -66,31 +258,141 @@ def load_peminjaman_detail():
             b.eksemplar,
 
             pt.id_petugas,
-            pt.nama_petugas
-        FROM peminjaman p
-        JOIN anggota a ON p.id_anggota = a.id_anggota
-        LEFT JOIN program_studi ps ON a.id_prodi = ps.id_prodi
-        LEFT JOIN fakultas f ON ps.id_fakultas = f.id_fakultas
-        JOIN buku b ON p.id_buku = b.id_buku
-        JOIN judul j ON b.id_judul = j.id_judul
-        JOIN klasifikasi k ON b.id_klasifikasi = k.id_klasifikasi
-        JOIN petugas pt ON p.id_petugas = pt.id_petugas
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
+            pt.nama_petugas{PEMINJAMAN_FROM_SQL}"""
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    df = _read_sql(query, params)
 
     df["tgl_pinjam"] = pd.to_datetime(df["tgl_pinjam"])
     df["tgl_kembali"] = pd.to_datetime(df["tgl_kembali"])
-    return df
+    return _as_category(_downcast_ints(df))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_peminjaman_facets():
+    """
+    Pilihan filter halaman Peminjaman langsung dari MySQL (SELECT DISTINCT,
+    MIN/MAX), tanpa menarik seluruh baris peminjaman ke pandas.
+
+    Hasil berupa dict:
+    - jumlah, min_date, max_date (tanggal pinjam; None jika belum ada data)
+    - fakultas, prodi, status_anggota, status_peminjaman, kategori (list terurut)
+    """
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT COUNT(*), MIN(p.tgl_pinjam), MAX(p.tgl_pinjam)"
+            + PEMINJAMAN_FROM_SQL
+        )
+        jumlah, min_tgl, max_tgl = cur.fetchone()
+        facets = {
+            "jumlah": jumlah,
+            "min_date": pd.Timestamp(min_tgl).date() if min_tgl is not None else None,
+            "max_date": pd.Timestamp(max_tgl).date() if max_tgl is not None else None,
+        }
+        for nama, expr in [
+            ("fakultas", "f.nama_fakultas"),
+            ("prodi", "ps.nama_prodi"),
+            ("status_anggota", "a.status"),
+            ("status_peminjaman", STATUS_PEMINJAMAN_SQL),
+            ("kategori", "k.kategori_buku"),
+        ]:
+            cur.execute(
+                f"SELECT DISTINCT {expr} AS nilai{PEMINJAMAN_FROM_SQL}"
+                f" WHERE {expr} IS NOT NULL ORDER BY nilai"
+            )
+            facets[nama] = [row[0] for row in cur.fetchall()]
+    return facets
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_kpi_peminjaman():
+    """
+    Angka KPI halaman Ringkasan dari satu query agregat MySQL:
+    total_peminjaman, anggota_aktif, buku_dipinjam, total_denda.
+    """
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+                COUNT(*),
+                COUNT(DISTINCT p.id_anggota),
+                COUNT(DISTINCT p.id_buku),
+                COALESCE(SUM(p.denda_buku), 0)"""
+            + PEMINJAMAN_FROM_SQL
+        )
+        total, anggota, buku, denda = cur.fetchone()
+    return {
+        "total_peminjaman": int(total),
+        "anggota_aktif": int(anggota),
+        "buku_dipinjam": int(buku),
+        "total_denda": int(denda),
+    }
+
+
+# Query agregat (GROUP BY di MySQL) untuk halaman Ringkasan.
+# Kolom hasil sama dengan agregasi pandas padanannya di charts.py.
+AGG_TREN_BULANAN_SQL = f"""
+        SELECT
+            DATE_FORMAT(p.tgl_pinjam, '%Y-%m') AS bulan,{STATUS_PEMINJAMAN_SQL} AS status_peminjaman,
+            COUNT(*) AS jumlah{PEMINJAMAN_FROM_SQL}
+        GROUP BY bulan, status_peminjaman
+        ORDER BY bulan, status_peminjaman
+    """
+
+AGG_PER_FAKULTAS_SQL = f"""
+        SELECT
+            f.nama_fakultas,
+            COUNT(*) AS jumlah,
+            AVG(p.durasi_peminjaman) AS rata_durasi{PEMINJAMAN_FROM_SQL}
+        WHERE f.nama_fakultas IS NOT NULL
+        GROUP BY f.nama_fakultas
+    """
+
+AGG_PER_KATEGORI_SQL = f"""
+        SELECT
+            k.kategori_buku,
+            COUNT(*) AS jumlah{PEMINJAMAN_FROM_SQL}
+        GROUP BY k.kategori_buku
+        ORDER BY jumlah DESC
+    """
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_agg_ringkasan():
+    """
+    Agregat halaman Ringkasan, ketiga query dijalankan BERSAMAAN di thread
+    terpisah (masing-masing dengan koneksi sendiri dari pool), sehingga waktu
+    tunggu MySQL saling tumpang-tindih. Hasil berupa dict DataFrame:
+    - tren: bulan ("YYYY-MM"), status_peminjaman, jumlah
+    - fakultas: nama_fakultas, jumlah, rata_durasi (bentuk agregat_per_fakultas)
+    - kategori: kategori_buku, jumlah (urut menurun)
+    """
+    # pool diambil di thread utama; thread pekerja tidak memanggil fungsi st.*
+    pool = get_pool()
+    queries = {
+        "tren": AGG_TREN_BULANAN_SQL,
+        "fakultas": AGG_PER_FAKULTAS_SQL,
+        "kategori": AGG_PER_KATEGORI_SQL,
+    }
+    with ThreadPoolExecutor(max_workers=len(queries)) as ex:
+        futures = {
+            nama: ex.submit(_read_sql, query, pool=pool)
+            for nama, query in queries.items()
+        }
+        agg = {nama: future.result() for nama, future in futures.items()}
 
+    # AVG dari MySQL terbaca sebagai Decimal
+    agg["fakultas"]["rata_durasi"] = agg["fakultas"]["rata_durasi"].astype(float)
+    return agg
 
-@st.cache_data
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=4, show_spinner=False)
 def load_anggota():
     """
     Mengambil data anggota, sudah digabung dengan program studi dan fakultas.
     Dipakai di halaman 'Anggota'.
     """
-    conn = get_connection()
     query = """
         SELECT
             a.id_anggota,
@@ -105,12 +407,14 @@ def load_anggota():
         LEFT JOIN program_studi ps ON a.id_prodi = ps.id_prodi
         LEFT JOIN fakultas f ON ps.id_fakultas = f.id_fakultas
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    df = _read_sql(query)
 
+    # versi huruf kecil untuk pencarian nama, dihitung sekali per load
+    df["_nama_lc"] = df["nama_anggota"].str.lower()
+    return _as_category(_downcast_ints(df))
 
-@st.cache_data
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=4, show_spinner=False)
 def load_buku():
     """
     Mengambil data koleksi buku beserta:
@@ -120,19 +424,16 @@ def load_buku():
     - tahun terbit, ISBN, status, dan eksemplar
 
     Sumber: tabel buku, judul, klasifikasi, buku_pengarang, pengarang.
+    Pengarang diambil lewat query terpisah lalu digabung di pandas, supaya
+    MySQL tidak perlu GROUP BY + GROUP_CONCAT atas seluruh kolom buku.
     """
-    conn = get_connection()
-    query = """
+    query_buku = """
         SELECT
             b.id_buku,
             j.kode_judul,
             j.judul,
             k.kode_klasifikasi,
             k.kategori_buku,
-            -- bisa lebih dari satu pengarang per buku
-            GROUP_CONCAT(pg.kode_pengarang
-                         ORDER BY bp.urutan_pengarang
-                         SEPARATOR ', ') AS kode_pengarang,
             b.tahun_terbit,
             b.isbn,
             b.status AS status_buku,
@@ -142,58 +443,59 @@ def load_buku():
             ON b.id_judul = j.id_judul
         JOIN klasifikasi k
             ON b.id_klasifikasi = k.id_klasifikasi
-        LEFT JOIN buku_pengarang bp
-            ON b.id_buku = bp.id_buku
-        LEFT JOIN pengarang pg
+        ORDER BY b.id_buku
+    """
+    query_pengarang = """
+        SELECT
+            bp.id_buku,
+            pg.kode_pengarang
+        FROM buku_pengarang bp
+        JOIN pengarang pg
             ON bp.id_pengarang = pg.id_pengarang
-        GROUP BY
-            b.id_buku,
-            j.kode_judul,
-            j.judul,
-            k.kode_klasifikasi,
-            k.kategori_buku,
-            b.tahun_terbit,
-            b.isbn,
-            b.status,
-            b.eksemplar
-        ORDER BY b.id_buku;
+        ORDER BY bp.id_buku, bp.urutan_pengarang
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    df = _read_sql(query_buku)
+    df_pengarang = _read_sql(query_pengarang)
+
+    # bisa lebih dari satu pengarang per buku; urutan sudah dari ORDER BY
+    pengarang = (
+        df_pengarang.dropna(subset=["kode_pengarang"])
+        .groupby("id_buku", sort=False)["kode_pengarang"]
+        .agg(", ".join)
+    )
+    # posisi kolom sama seperti hasil GROUP_CONCAT sebelumnya
+    df.insert(
+        df.columns.get_loc("kategori_buku") + 1,
+        "kode_pengarang",
+        df["id_buku"].map(pengarang),
+    )
+
+    # versi huruf kecil untuk pencarian judul, dihitung sekali per load
+    df["_judul_lc"] = df["judul"].str.lower()
+    return _as_category(_downcast_ints(df))
 
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_fakultas():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM fakultas", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM fakultas")
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_program_studi():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM program_studi", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM program_studi")
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_pengarang():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM pengarang", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM pengarang")
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_buku_pengarang():
     """
     Mengambil data relasi buku-pengarang beserta nama judul & nama pengarang.
     """
-    conn = get_connection()
     query = """
         SELECT
             bp.id_buku_pengarang,
@@ -207,28 +509,17 @@ def load_buku_pengarang():
         JOIN judul j ON b.id_judul = j.id_judul
         JOIN pengarang pg ON bp.id_pengarang = pg.id_pengarang
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return _read_sql(query)
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_petugas():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM petugas", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM petugas")
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_judul():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM judul", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM judul")
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False)
 def load_klasifikasi():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM klasifikasi", conn)
-    conn.close()
-    return df
+    return _read_sql("SELECT * FROM klasifikasi")